@@ -25,17 +25,52 @@ Please keep this script compatible with Python 2.7, and 3.4 to 3.7.
 from __future__ import print_function
 
 import argparse
+from contextlib import closing
 from datetime import datetime
+import glob
+import hashlib
 import logging
+import multiprocessing
+from multiprocessing.pool import ThreadPool
 import os
+import re
 try:
+    from urllib.error import URLError
     from urllib.request import urlopen
 except ImportError:
-    from urllib2 import urlopen
+    from urllib2 import URLError, urlopen
 import subprocess
 import shutil
+import signal
+import struct
 import sys
 import tarfile
+import zlib
+
+try:
+    from shutil import which
+except ImportError:
+    def which(cmd):
+        for path in os.environ.get("PATH", os.defpath).split(os.pathsep):
+            fname = os.path.join(path, cmd)
+            if os.path.isfile(fname) and os.access(fname, os.X_OK):
+                return fname
+        return None
+
+try:
+    from functools import cached_property
+except ImportError:
+    class cached_property(object):
+        """Minimal functools.cached_property for Python < 3.8"""
+        def __init__(self, func):
+            self.func = func
+            self.__doc__ = func.__doc__
+
+        def __get__(self, instance, owner=None):
+            if instance is None:
+                return self
+            value = instance.__dict__[self.func.__name__] = self.func(instance)
+            return value
 
 
 log = logging.getLogger("multissl")
@@ -62,10 +97,56 @@ LIBRESSL_RECENT_VERSIONS = [
     "2.5.5",
 ]
 
+# read / write buffer for tar file extraction
+TAR_BUFSIZE = 2 * 1024 * 1024
+
+# ccache's compiler symlinks (Debian, Fedora, Homebrew)
+CCACHE_DIRS = (
+    "/usr/lib/ccache",
+    "/usr/lib64/ccache",
+    "/usr/local/opt/ccache/libexec",
+)
+
+# overlapping test runs, limits concurrent network tests
+MAX_TEST_RUNS = 4
+
 # store files in ../multissl
 HERE = os.path.abspath(os.getcwd())
 MULTISSL_DIR = os.path.abspath(os.path.join(HERE, '..', 'multissl'))
 
+
+def cpu_count():
+    """Number of CPUs, 1 if undeterminable"""
+    try:
+        return multiprocessing.cpu_count()
+    except NotImplementedError:
+        return 1
+
+
+def iter_files(top):
+    """Recursively yield paths of all files below top"""
+    if not os.path.isdir(top):
+        return
+    if not hasattr(os, "scandir"):
+        # Python < 3.5
+        for root, dirs, files in os.walk(top):
+            for filename in files:
+                yield os.path.join(root, filename)
+        return
+    stack = [top]
+    while stack:
+        try:
+            entries = os.scandir(stack.pop())
+        except OSError:
+            # ignore vanished directories like os.walk
+            continue
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                stack.append(entry.path)
+            else:
+                yield entry.path
+
+
 parser = argparse.ArgumentParser(
     prog='multissl',
     description=(
@@ -118,27 +199,63 @@ parser.add_argument(
     dest='network',
     help="Disable network tests."
 )
+parser.add_argument(
+    '--no-src-cache',
+    action='store_false',
+    dest='src_cache',
+    help="Don't store downloaded tar bundles, unpack them on the fly."
+)
 parser.add_argument(
     '--compile-only',
     action='store_true',
     help="Don't run tests, only compile _ssl.c and _hashopenssl.c."
 )
+parser.add_argument(
+    '--parallel-tests',
+    action='store_true',
+    help=(
+        "Overlap test runs of multiple versions. Subprocesses started "
+        "with -E or -I may load the modules of another version."
+    )
+)
+
+
+class _TarFile(tarfile.TarFile):
+    """TarFile that copies member data in large chunks
+
+    tarfile defaults to 16 KiB reads and writes. The copy buffer size is
+    configurable since Python 3.8, older versions ignore the attribute.
+    """
+    def __init__(self, *args, **kwargs):
+        super(_TarFile, self).__init__(*args, **kwargs)
+        self.copybufsize = TAR_BUFSIZE
 
 
 class AbstractBuilder(object):
     library = None
     url_template = None
     src_template = None
+    sha256_url_template = None
     build_template = None
+    install_target = "install"
 
     module_files = ("Modules/_ssl.c",
                     "Modules/_hashopenssl.c")
     module_libs = ("_ssl", "_hashlib")
+    # fingerprint of the last module build in Python's build dir, only
+    # one build at a time
+    stamp_file = os.path.join("build", ".multissl.stamp")
 
     def __init__(self, version, compile_args=(),
-                 basedir=MULTISSL_DIR):
+                 basedir=MULTISSL_DIR, jobs=None, src_cache=True):
         self.version = version
         self.compile_args = compile_args
+        # keep downloaded tar bundles in src_dir
+        self.src_cache = src_cache
+        # cached output of 'openssl version'
+        self._openssl_version = None
+        # number of parallel make jobs, None for automatic
+        self.jobs = jobs
         # installation directory
         self.install_dir = os.path.join(
             os.path.join(basedir, self.library.lower()), version
@@ -147,9 +264,26 @@ class AbstractBuilder(object):
         self.src_dir = os.path.join(basedir, 'src')
         self.src_file = os.path.join(
             self.src_dir, self.src_template.format(version))
+        # sha256 of a completely downloaded source file
+        self.src_sha256_file = self.src_file + '.sha256'
+        self._has_src = False
         # build directory (removed after install)
         self.build_dir = os.path.join(
             self.src_dir, self.build_template.format(version))
+        # private temp directory for test runs
+        self.tmp_dir = os.path.join(
+            basedir, 'tmp', self.build_template.format(version))
+        # copies of compiled modules for concurrent test runs
+        self.pymods_dir = os.path.join(
+            basedir, 'pymods', self.build_template.format(version))
+        # test output of concurrent test runs
+        self.test_log = self.tmp_dir + '.log'
+        # output of configure and make, None for stdout
+        self.build_log = None
+        # subprocess environments, computed once and never modified
+        self._run_env = dict(os.environ, LD_LIBRARY_PATH=self.lib_dir)
+        self._build_env = self._get_build_env()
+        self._test_env = self._get_test_env()
 
     def __str__(self):
         return "<{0.__class__.__name__} for {0.version}>".format(self)
@@ -165,7 +299,7 @@ class AbstractBuilder(object):
     def __hash__(self):
         return hash((self.library, self.version))
 
-    @property
+    @cached_property
     def openssl_cli(self):
         """openssl CLI binary"""
         return os.path.join(self.install_dir, "bin", "openssl")
@@ -173,8 +307,12 @@ class AbstractBuilder(object):
     @property
     def openssl_version(self):
         """output of 'bin/openssl version'"""
-        cmd = [self.openssl_cli, "version"]
-        return self._subprocess_output(cmd)
+        # memoized on the instance, functools.cached_property serializes
+        # concurrent readers with a lock shared by all instances
+        if self._openssl_version is None:
+            cmd = [self.openssl_cli, "version"]
+            self._openssl_version = self._subprocess_output(cmd)
+        return self._openssl_version
 
     @property
     def pyssl_version(self):
@@ -185,11 +323,11 @@ class AbstractBuilder(object):
         ]
         return self._subprocess_output(cmd)
 
-    @property
+    @cached_property
     def include_dir(self):
         return os.path.join(self.install_dir, "include")
 
-    @property
+    @cached_property
     def lib_dir(self):
         return os.path.join(self.install_dir, "lib")
 
@@ -199,54 +337,193 @@ class AbstractBuilder(object):
 
     @property
     def has_src(self):
-        return os.path.isfile(self.src_file)
+        """Source file is fully downloaded and not corrupted
+
+        A positive result is cached, hashing the tar bundle is expensive.
+        """
+        if not self._has_src:
+            self._has_src = self._verify_src()
+        return self._has_src
+
+    def _verify_src(self):
+        if not os.path.isfile(self.src_file):
+            return False
+        if not os.path.isfile(self.src_sha256_file):
+            return self._adopt_src()
+        with open(self.src_sha256_file) as f:
+            expected = f.read().strip()
+        sha256 = hashlib.sha256()
+        with open(self.src_file, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                sha256.update(chunk)
+        return sha256.hexdigest() == expected
 
     def _subprocess_call(self, cmd, env=None, **kwargs):
         log.debug("Call '{}'".format(" ".join(cmd)))
         return subprocess.check_call(cmd, env=env, **kwargs)
 
+    def _subprocess_popen(self, cmd, env=None, **kwargs):
+        log.debug("Start '{}'".format(" ".join(cmd)))
+        return subprocess.Popen(cmd, env=env, **kwargs)
+
     def _subprocess_output(self, cmd, env=None, **kwargs):
         log.debug("Call '{}'".format(" ".join(cmd)))
         if env is None:
-            env = os.environ.copy()
-            env["LD_LIBRARY_PATH"] = self.lib_dir
+            env = self._run_env
         out = subprocess.check_output(cmd, env=env, **kwargs)
         return out.strip().decode("utf-8")
 
+    def _adopt_src(self):
+        """Keep a source file that was cached without checksum file
+
+        The gzip stream is decompressed to the end in the same pass that
+        computes the sha256. zlib verifies the CRC, the size in the gzip
+        trailer catches truncated downloads.
+        """
+        sha256 = hashlib.sha256()
+        decomp = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        size = 0
+        tail = b""
+        try:
+            with open(self.src_file, "rb") as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                    sha256.update(chunk)
+                    size += len(decomp.decompress(chunk))
+                    tail = (tail + chunk)[-4:]
+        except zlib.error as e:
+            log.warning("Corrupted {}: {}".format(self.src_file, e))
+            return False
+        complete = (
+            getattr(decomp, "eof", True) and len(tail) == 4 and
+            struct.unpack("<I", tail)[0] == size & 0xffffffff
+        )
+        if not complete:
+            log.warning("Truncated {}".format(self.src_file))
+            return False
+        with open(self.src_sha256_file, "w") as f:
+            f.write(sha256.hexdigest() + "\n")
+        return True
+
     def _download_src(self):
         """Download sources"""
         src_dir = os.path.dirname(self.src_file)
         if not os.path.isdir(src_dir):
-            os.makedirs(src_dir)
+            try:
+                os.makedirs(src_dir)
+            except OSError:
+                # concurrent builds may create the directory, too
+                if not os.path.isdir(src_dir):
+                    raise
         url = self.url_template.format(self.version)
         log.info("Downloading from {}".format(url))
-        req = urlopen(url)
-        # KISS, read all, write all
-        data = req.read()
         log.info("Storing {}".format(self.src_file))
-        with open(self.src_file, "wb") as f:
-            f.write(data)
+        # partial downloads never end up in src_file
+        part_file = self.src_file + ".part"
+        sha256 = hashlib.sha256()
+        with closing(urlopen(url)) as req:
+            with open(part_file, "wb") as f:
+                for chunk in iter(lambda: req.read(1024 * 1024), b""):
+                    sha256.update(chunk)
+                    f.write(chunk)
+        digest = sha256.hexdigest()
+        expected = self._published_sha256()
+        if expected is not None and digest != expected:
+            os.unlink(part_file)
+            raise ValueError(url, digest, expected)
+        with open(self.src_sha256_file, "w") as f:
+            f.write(digest + "\n")
+        os.rename(part_file, self.src_file)
+        self._has_src = True
+
+    def _published_sha256(self):
+        """Upstream sha256 of the source file, None if unavailable"""
+        if self.sha256_url_template is None:
+            return None
+        url = self.sha256_url_template.format(self.version)
+        try:
+            with closing(urlopen(url)) as req:
+                data = req.read(4096)
+        except URLError as e:
+            log.warning("No checksum from {}: {}".format(url, e))
+            return None
+        # plain digest or 'digest *filename', ignore anything else
+        mo = re.match(br"\s*([0-9a-fA-F]{64})(\s|$)", data)
+        if mo is None:
+            log.warning("No valid checksum in {}".format(url))
+            return None
+        return mo.group(1).decode("ascii").lower()
+
+    def _download_and_unpack(self):
+        """Download sources and unpack them without storing the bundle"""
+        url = self.url_template.format(self.version)
+        log.info("Downloading from {}".format(url))
+        self._clean_build_dir()
+        with closing(urlopen(url)) as req:
+            tf = _TarFile.open(fileobj=req, mode="r|gz", bufsize=TAR_BUFSIZE)
+            with closing(tf):
+                self._extract(tf)
 
     def _unpack_src(self):
         """Unpack tar.gz bundle"""
-        # cleanup
+        self._clean_build_dir()
+        pigz = which("pigz")
+        if pigz is None:
+            # streaming mode, single pass without a member index
+            tf = _TarFile.open(
+                self.src_file, mode="r|gz", bufsize=TAR_BUFSIZE)
+            with closing(tf):
+                self._extract(tf)
+            return
+
+        # decompress in a pigz process while Python extracts members
+        cmd = [pigz, "-dc", self.src_file]
+        proc = self._subprocess_popen(cmd, stdout=subprocess.PIPE)
+        try:
+            tf = _TarFile.open(
+                fileobj=proc.stdout, mode="r|", bufsize=TAR_BUFSIZE)
+            with closing(tf):
+                self._extract(tf)
+            # consume trailing padding, pigz fails on a closed pipe
+            while proc.stdout.read(TAR_BUFSIZE):
+                pass
+        finally:
+            proc.stdout.close()
+            proc.wait()
+        if proc.returncode != 0:
+            raise subprocess.CalledProcessError(proc.returncode, cmd)
+
+    def _clean_build_dir(self):
         if os.path.isdir(self.build_dir):
             shutil.rmtree(self.build_dir)
         os.makedirs(self.build_dir)
 
-        tf = tarfile.open(self.src_file)
+    def _extract(self, tf):
+        """Extract members of tar file into build dir"""
+        log.info("Unpacking files to {}".format(self.build_dir))
+        if hasattr(tarfile, "data_filter"):
+            # Python 3.12, 3.11.4, 3.10.12, 3.9.17, 3.8.17
+            tf.extractall(self.build_dir, filter=self._member_filter)
+        else:
+            members = (
+                self._member_filter(member, self.build_dir) for member in tf
+            )
+            tf.extractall(
+                self.build_dir,
+                (member for member in members if member is not None)
+            )
+
+    def _member_filter(self, member, path):
+        """Force extraction into build dir, skip top level directory"""
         name = self.build_template.format(self.version)
         base = name + '/'
-        # force extraction into build dir
-        members = tf.getmembers()
-        for member in list(members):
-            if member.name == name:
-                members.remove(member)
-            elif not member.name.startswith(base):
-                raise ValueError(member.name, base)
-            member.name = member.name[len(base):].lstrip('/')
-        log.info("Unpacking files to {}".format(self.build_dir))
-        tf.extractall(self.build_dir, members)
+        if member.name == name:
+            return None
+        elif not member.name.startswith(base):
+            raise ValueError(member.name, base)
+        member.name = member.name[len(base):].lstrip('/')
+        if hasattr(tarfile, "data_filter"):
+            return tarfile.data_filter(member, path)
+        return member
 
     def _build_src(self):
         """Now build openssl"""
@@ -254,53 +531,155 @@ class AbstractBuilder(object):
         cwd = self.build_dir
         cmd = ["./config", "shared", "--prefix={}".format(self.install_dir)]
         cmd.extend(self.compile_args)
-        self._subprocess_call(cmd, cwd=cwd)
-        self._subprocess_call(["make", "-j1"], cwd=cwd)
+        self._build_call(cmd)
+        self._make()
+
+    def _build_call(self, cmd):
+        """Run a build command in build dir, output goes to build_log"""
+        if self.build_log is None:
+            return self._subprocess_call(cmd, cwd=self.build_dir)
+        with open(self.build_log, "ab") as f:
+            return self._subprocess_call(
+                cmd, cwd=self.build_dir, stdout=f, stderr=subprocess.STDOUT)
+
+    def _make(self, *targets):
+        """Run parallel make, retry with -j1 on failure
+
+        Some older OpenSSL releases have racy Makefiles.
+        """
+        jobs = self.jobs or cpu_count()
+        cmd = ["make", "-j{}".format(jobs)]
+        cmd.extend(targets)
+        try:
+            self._build_call(cmd)
+        except subprocess.CalledProcessError:
+            if jobs == 1:
+                raise
+            log.warning("Parallel make failed, retrying with -j1")
+            cmd = ["make", "-j1"]
+            cmd.extend(targets)
+            self._build_call(cmd)
 
     def _make_install(self, remove=True):
-        self._subprocess_call(["make", "-j1", "install"], cwd=self.build_dir)
+        self._make(self.install_target)
         if remove:
             shutil.rmtree(self.build_dir)
 
     def install(self):
         log.info(self.openssl_cli)
         if not self.has_openssl:
-            if not self.has_src:
+            if self.build_log is not None:
+                log.info("Building {}, output in {}".format(
+                    self, self.build_log))
+                log_dir = os.path.dirname(self.build_log)
+                if not os.path.isdir(log_dir):
+                    try:
+                        os.makedirs(log_dir)
+                    except OSError:
+                        # concurrent builds may create the directory, too
+                        if not os.path.isdir(log_dir):
+                            raise
+                open(self.build_log, "wb").close()
+            if self.has_src:
+                log.debug("Already has src {}".format(self.src_file))
+                self._unpack_src()
+            elif self.src_cache:
                 self._download_src()
+                self._unpack_src()
             else:
-                log.debug("Already has src {}".format(self.src_file))
-            self._unpack_src()
+                self._download_and_unpack()
             self._build_src()
             self._make_install()
         else:
             log.info("Already has installation {}".format(self.install_dir))
-        # validate installation
+
+    def check_openssl(self):
+        """validate installation"""
         version = self.openssl_version
         if self.version not in version:
             raise ValueError(version)
 
-    def recompile_pymods(self):
-        log.warning("Using build from {}".format(self.build_dir))
-        # force a rebuild of all modules that use OpenSSL APIs
-        for fname in self.module_files:
-            os.utime(fname, None)
-        # remove all build artefacts
-        for root, dirs, files in os.walk('build'):
-            for filename in files:
-                if filename.startswith(self.module_libs):
-                    os.unlink(os.path.join(root, filename))
-
+    def _get_build_env(self):
+        """Environment for recompile_pymods()"""
         # overwrite header and library search paths
         env = os.environ.copy()
         env["CPPFLAGS"] = "-I{}".format(self.include_dir)
         env["LDFLAGS"] = "-L{}".format(self.lib_dir)
         # set rpath
         env["LD_RUN_PATH"] = self.lib_dir
+        # ccache hits for recurring versions. Don't set CC, setup.py then
+        # replaces the compiler command and drops CPPFLAGS.
+        for ccache_dir in CCACHE_DIRS:
+            if os.path.isdir(ccache_dir):
+                env["PATH"] = os.pathsep.join(
+                    [ccache_dir, env.get("PATH", os.defpath)])
+                env["CCACHE_BASEDIR"] = HERE
+                break
+        return env
+
+    def _get_test_env(self):
+        """Environment for run_python_tests()"""
+        env = os.environ.copy()
+        # test workers create temporary files, keep them apart per build
+        env["TMPDIR"] = self.tmp_dir
+        pythonpath = [self.pymods_dir]
+        if env.get("PYTHONPATH"):
+            pythonpath.append(env["PYTHONPATH"])
+        env["PYTHONPATH"] = os.pathsep.join(pythonpath)
+        return env
+
+    def _module_artefacts(self):
+        """Build artefacts of modules that use OpenSSL APIs"""
+        # only distutils' dirs, regrtest creates scratch dirs in build/, too
+        tops = glob.glob(os.path.join('build', 'lib.*'))
+        tops.extend(glob.glob(os.path.join('build', 'temp.*')))
+        for top in sorted(tops):
+            for fname in iter_files(top):
+                if os.path.basename(fname).startswith(self.module_libs):
+                    yield fname
+
+    def _build_stamp(self):
+        """Fingerprint of build config, sources and artefacts"""
+        files = [self.openssl_cli]
+        files.extend(self.module_files)
+        files.extend(sorted(self._module_artefacts()))
+        state = (
+            self.library, self.version, self.include_dir, self.lib_dir,
+            [(fname, os.stat(fname).st_mtime) for fname in files]
+        )
+        return hashlib.sha256(repr(state).encode("utf-8")).hexdigest()
+
+    def recompile_pymods(self):
+        """Rebuild modules that use OpenSSL APIs against this build
+
+        Python's build directory holds the modules of one build at a time.
+        The stamp only records the most recently compiled build, so the
+        rebuild is skipped when the same single version is tested again.
+        Runs with multiple versions rebuild every version.
+        """
+        if os.path.isfile(self.stamp_file):
+            with open(self.stamp_file) as f:
+                if f.read().strip() == self._build_stamp():
+                    log.info("Python modules are up to date for {}".format(
+                        self))
+                    self.check_imports()
+                    return
+            os.unlink(self.stamp_file)
+
+        log.warning("Using build from {}".format(self.build_dir))
+        # force a rebuild of all modules that use OpenSSL APIs
+        for fname in self.module_files:
+            os.utime(fname, None)
+        # remove all build artefacts
+        for fname in list(self._module_artefacts()):
+            os.unlink(fname)
 
         log.info("Rebuilding Python modules")
         cmd = [sys.executable, "setup.py", "build"]
-        self._subprocess_call(cmd, env=env)
+        self._subprocess_call(cmd, env=self._build_env)
         self.check_imports()
+        with open(self.stamp_file, "w") as f:
+            f.write(self._build_stamp())
 
     def check_imports(self):
         cmd = [sys.executable, "-c", "import _ssl; import _hashlib"]
@@ -311,25 +690,63 @@ class AbstractBuilder(object):
         if self.version not in version:
             raise ValueError(version)
 
-    def run_python_tests(self, tests, network=True):
+    def _copy_pymods(self):
+        """Copy compiled modules out of the shared build directory"""
+        if os.path.isdir(self.pymods_dir):
+            shutil.rmtree(self.pymods_dir)
+        os.makedirs(self.pymods_dir)
+        for fname in self._module_artefacts():
+            if fname.endswith(".so"):
+                shutil.copy2(fname, self.pymods_dir)
+
+    def run_python_tests(self, tests, network=True, logfile=False,
+                         jobs=None):
+        """Start test suite, returns Popen object
+
+        The compiled modules are copied and put in front of PYTHONPATH.
+        With --parallel-tests, recompile_pymods() rebuilds the modules for
+        the next build while this run is active. Subprocesses that are
+        started with -E or -I (e.g. script_helper, test_venv) ignore
+        PYTHONPATH and may load the modules of another build.
+
+        The test run is started in a new process group, see kill_tests().
+        With logfile, output is written to test_log instead of stdout.
+        """
+        jobs = '-j{}'.format(jobs or cpu_count())
         if not tests:
-            cmd = [sys.executable, 'Lib/test/ssltests.py', '-j0']
+            cmd = [sys.executable, 'Lib/test/ssltests.py', jobs]
         elif sys.version_info < (3, 3):
-            cmd = [sys.executable, '-m', 'test.regrtest']
+            cmd = [sys.executable, '-m', 'test.regrtest', jobs]
         else:
-            cmd = [sys.executable, '-m', 'test', '-j0']
+            cmd = [sys.executable, '-m', 'test', jobs]
         if network:
             cmd.extend(['-u', 'network', '-u', 'urlfetch'])
         cmd.extend(['-w', '-r'])
         cmd.extend(tests)
-        self._subprocess_call(cmd, stdout=None)
+        self._copy_pymods()
+        if not os.path.isdir(self.tmp_dir):
+            os.makedirs(self.tmp_dir)
+        env = self._test_env
+        if not logfile:
+            return self._subprocess_popen(
+                cmd, env=env, preexec_fn=os.setsid)
+        log.info("Running tests for {}, output in {}".format(
+            self, self.test_log))
+        with open(self.test_log, "wb") as f:
+            return self._subprocess_popen(
+                cmd, env=env, stdout=f, stderr=subprocess.STDOUT,
+                preexec_fn=os.setsid)
 
 
 class BuildOpenSSL(AbstractBuilder):
     library = "OpenSSL"
     url_template = "https://www.openssl.org/source/openssl-{}.tar.gz"
     src_template = "openssl-{}.tar.gz"
+    sha256_url_template = (
+        "https://www.openssl.org/source/openssl-{}.tar.gz.sha256")
     build_template = "openssl-{}"
+    # skip man pages and HTML docs
+    install_target = "install_sw"
 
 
 class BuildLibreSSL(AbstractBuilder):
@@ -340,6 +757,95 @@ class BuildLibreSSL(AbstractBuilder):
     build_template = "libressl-{}"
 
 
+# Pool.map() of Python 2.7 waits without timeout and can't be interrupted
+POOL_TIMEOUT = 24 * 60 * 60
+
+
+def pool_map(pool, func, iterable):
+    """Pool.map() that can be interrupted with Ctrl-C, consumes pool"""
+    try:
+        result = pool.map_async(func, iterable).get(POOL_TIMEOUT)
+    except BaseException:
+        pool.terminate()
+        raise
+    else:
+        pool.close()
+    finally:
+        pool.join()
+    return result
+
+
+def _install(build):
+    """Install a build (helper for multiprocessing pools)
+
+    Failures are re-raised as RuntimeError that names the build. The
+    original exception may not survive the trip to the parent process.
+    """
+    try:
+        build.install()
+    except Exception as e:
+        log.exception("%s failed", build)
+        msg = "{} failed: {}".format(build, e)
+        if build.build_log is not None:
+            msg += ", see {}".format(build.build_log)
+        raise RuntimeError(msg)
+
+
+def install_builds(builds):
+    """Download, compile and install builds concurrently
+
+    Tar bundles are downloaded in threads up front. Every build runs in
+    its own process, the make jobs are split among the worker processes.
+    """
+    # prefetch all tar bundles, downloads are network bound
+    downloads = [
+        build for build in builds
+        if build.src_cache and not build.has_openssl and not build.has_src
+    ]
+    if downloads:
+        pool = ThreadPool(min(len(downloads), 8))
+        pool_map(pool, AbstractBuilder._download_src, downloads)
+
+    ncpu = cpu_count()
+    workers = max(1, min(len(builds), ncpu // 4))
+    for build in builds:
+        # keep an explicit number of make jobs
+        if build.jobs is None:
+            build.jobs = max(1, ncpu // workers)
+        # don't interleave output of concurrent builds
+        if workers > 1:
+            build.build_log = build.tmp_dir + '-build.log'
+    if workers <= 1:
+        for build in builds:
+            _install(build)
+    else:
+        pool_map(multiprocessing.Pool(workers), _install, builds)
+    # validate installations, the checks mostly wait for subprocesses
+    pool = ThreadPool(max(1, min(len(builds), ncpu)))
+    pool_map(pool, AbstractBuilder.check_openssl, builds)
+
+
+def wait_tests(build, proc, logfile):
+    """Wait for a test run, returns False and reports failures"""
+    if proc.wait() == 0:
+        return True
+    msg = "{} failed: tests exited with {}".format(build, proc.returncode)
+    if logfile:
+        msg += ", see {}".format(build.test_log)
+    print(msg, file=sys.stderr)
+    return False
+
+
+def kill_tests(proc):
+    """Terminate a test run including the wrapped regrtest and workers"""
+    if proc.poll() is None:
+        try:
+            os.killpg(proc.pid, signal.SIGTERM)
+        except OSError:
+            pass
+    proc.wait()
+
+
 def configure_make():
     if not os.path.isfile('Makefile'):
         log.info('Running ./configure')
@@ -349,7 +855,7 @@ def configure_make():
         ])
 
     log.info('Running make')
-    subprocess.check_call(['make', '--quiet'])
+    subprocess.check_call(['make', '-j{}'.format(cpu_count()), '--quiet'])
 
 
 def main():
@@ -385,28 +891,65 @@ def main():
     builds = []
 
     for version in args.openssl:
-        build = BuildOpenSSL(version)
-        build.install()
-        builds.append(build)
+        builds.append(BuildOpenSSL(version, src_cache=args.src_cache))
 
     for version in args.libressl:
-        build = BuildLibreSSL(version)
-        build.install()
-        builds.append(build)
-
-    for build in builds:
-        try:
-            build.recompile_pymods()
-            build.check_pyssl()
-            if not args.compile_only:
-                build.run_python_tests(
-                    tests=args.tests,
-                    network=args.network,
-                )
-        except Exception as e:
-            log.exception("%s failed", build)
-            print("{} failed: {}".format(build, e), file=sys.stderr)
-            sys.exit(2)
+        builds.append(BuildLibreSSL(version, src_cache=args.src_cache))
+
+    try:
+        install_builds(builds)
+    except Exception as e:
+        print(e, file=sys.stderr)
+        sys.exit(2)
+
+    # modules are compiled one after another. With --parallel-tests, up to
+    # MAX_TEST_RUNS test runs overlap and share the CPUs. Otherwise a test
+    # run finishes before the modules are rebuilt for the next build.
+    ncpu = cpu_count()
+    if args.parallel_tests:
+        max_runs = max(1, min(len(builds), ncpu // 4, MAX_TEST_RUNS))
+    else:
+        max_runs = 1
+    test_jobs = max(1, ncpu // max_runs)
+    logfile = max_runs > 1
+    procs = []
+    failed = False
+    try:
+        for build in builds:
+            try:
+                build.recompile_pymods()
+                build.check_pyssl()
+                if not args.compile_only:
+                    if len(procs) >= max_runs:
+                        if not wait_tests(*procs[0], logfile=logfile):
+                            failed = True
+                        procs.pop(0)
+                    procs.append((build, build.run_python_tests(
+                        tests=args.tests,
+                        network=args.network,
+                        logfile=logfile,
+                        jobs=test_jobs,
+                    )))
+                    if max_runs == 1:
+                        # serial runs stop at the first failure
+                        if not wait_tests(*procs[0], logfile=logfile):
+                            sys.exit(2)
+                        procs.pop(0)
+            except Exception as e:
+                log.exception("%s failed", build)
+                print("{} failed: {}".format(build, e), file=sys.stderr)
+                sys.exit(2)
+
+        while procs:
+            if not wait_tests(*procs[0], logfile=logfile):
+                failed = True
+            procs.pop(0)
+    finally:
+        # test runs have their own process group and don't get Ctrl-C
+        for _, proc in procs:
+            kill_tests(proc)
+    if failed:
+        sys.exit(2)
 
     print("\n{} finished in {}".format(
         "Tests" if not args.compile_only else "Builds",